@@ -3,14 +3,29 @@ import requests
 import datetime
 from PyPDF2 import PdfReader
 from docx import Document
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
-from reportlab.lib.units import mm
-from reportlab.lib.utils import simpleSplit
-import io
 import os
-import re
 import sqlite3
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from renderers import (
+    POOLED_EXPORT_FORMATS,
+    create_docx_bulk_preserve_format,
+    create_export_bundle,
+    create_pdf,
+    create_pdf_from_inputs_preserve_format,
+    make_export_pool,
+)
+
+GEMINI_URL = "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent"
+# Hedging: send a duplicate request once the first is slower than this
+# percentile of recent attempts, but only for at most HEDGE_BUDGET of calls
+HEDGE_PERCENTILE = 95
+HEDGE_BUDGET = 0.1
+HEDGE_MIN_SAMPLES = 20
+HEDGE_DEFAULT_DELAY = 5.0  # seconds, used until enough samples are recorded
 
 # Helper functions
 def extract_text_from_pdf(file):
@@ -25,15 +40,133 @@ def extract_text_from_docx(file):
     text = "\n".join([para.text for para in doc.paragraphs])
     return text
 
-def generate_questions_gemini(api_key, material, params):
+class LatencyStats:
+    def __init__(self, window=500):
+        self.lock = threading.Lock()
+        self.attempts = deque(maxlen=window)  # latency of each HTTP attempt
+        self.calls = deque(maxlen=window)  # latency seen by the user per call
+        self.total_calls = 0
+        self.total_hedges = 0
+
+    def record_attempt(self, seconds):
+        with self.lock:
+            self.attempts.append(seconds)
+
+    def start_call(self):
+        # Count calls when they start so overlapping calls share one budget
+        with self.lock:
+            self.total_calls += 1
+
+    def finish_call(self, seconds):
+        with self.lock:
+            self.calls.append(seconds)
+
+    @staticmethod
+    def _percentile(samples, pct):
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+        return ordered[index]
+
+    def hedge_delay(self, pct=HEDGE_PERCENTILE, min_samples=HEDGE_MIN_SAMPLES, default=HEDGE_DEFAULT_DELAY):
+        with self.lock:
+            if len(self.attempts) < min_samples:
+                return default
+            return self._percentile(list(self.attempts), pct)
+
+    def try_acquire_hedge(self, budget=HEDGE_BUDGET):
+        # Check the budget and reserve a hedge in one step
+        with self.lock:
+            if self.total_hedges < budget * self.total_calls:
+                self.total_hedges += 1
+                return True
+            return False
+
+    def p99(self):
+        with self.lock:
+            return self._percentile(list(self.calls), 99)
+
+    def hedge_rate(self):
+        with self.lock:
+            return self.total_hedges / self.total_calls if self.total_calls else 0.0
+
+    def summary(self):
+        return {
+            "calls": self.total_calls,
+            "hedges": self.total_hedges,
+            "hedge_rate": self.hedge_rate(),
+            "p99": self.p99(),
+        }
+
+@st.cache_resource
+def get_gemini_latency_stats():
+    # Shared across Streamlit reruns so the hedge deadline and budget persist
+    return LatencyStats()
+
+def _timed_post(url, headers, data, timeout, stats, cancelled):
+    start = time.perf_counter()
+    try:
+        response = requests.post(url, headers=headers, json=data, timeout=timeout)
+    finally:
+        # Timeouts and connection errors count towards the latency window too
+        stats.record_attempt(time.perf_counter() - start)
+    if cancelled.is_set():
+        # Lost the race: drop the response and release its connection
+        response.close()
+    return response
+
+def post_with_hedging(url, headers, data, timeout=None, stats=None, budget=HEDGE_BUDGET, percentile=HEDGE_PERCENTILE):
+    # Send the request; if it has not answered within the percentile deadline
+    # and the hedge budget allows, send a duplicate and take the first 2xx answer.
+    # Errors (exceptions or non-2xx) fall back to the attempt still running and
+    # are returned or raised only when no attempt is left.
+    # requests cannot abort a call already in flight, so the loser is cancelled
+    # if it has not started, otherwise its response is discarded when it arrives.
+    if stats is None:
+        stats = get_gemini_latency_stats()
+    start = time.perf_counter()
+    stats.start_call()
+    executor = ThreadPoolExecutor(max_workers=2)
+    cancelled = threading.Event()
+    try:
+        pending = {executor.submit(_timed_post, url, headers, data, timeout, stats, cancelled)}
+        done, pending = wait(pending, timeout=stats.hedge_delay(pct=percentile))
+        if not done and stats.try_acquire_hedge(budget):
+            pending.add(executor.submit(_timed_post, url, headers, data, timeout, stats, cancelled))
+        while True:
+            if not done:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            future = done.pop()
+            if future.exception() is None and future.result().ok:
+                cancelled.set()
+                for other in pending:
+                    other.cancel()
+                return future.result()
+            # One attempt failed: fall back to the other if it is still running
+            if not done and not pending:
+                if future.exception() is not None:
+                    raise future.exception()
+                return future.result()
+    finally:
+        executor.shutdown(wait=False)
+        stats.finish_call(time.perf_counter() - start)
+
+def generate_questions_gemini(api_key, material, params, hedge=False, base_url=GEMINI_URL, timeout=None):
     prompt = f"""
     Generate a question paper from the following material.\nMaterial:\n{material}\n\nParameters:\nTotal Marks: {params['total_marks']}\nMCQs (1 mark): {params['mcq_count']}\nOne-liner (1 mark): {params['one_liner_count']}\nShort (2 marks): {params['short_count']}\nLong (5 marks): {params['long_count']}\nFormat: List questions with marks.\n"""
-    url = "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent?key=" + api_key
+    url = base_url + "?key=" + api_key
     headers = {"Content-Type": "application/json"}
     data = {
         "contents": [{"parts": [{"text": prompt}]}]
     }
-    response = requests.post(url, headers=headers, json=data)
+    if hedge:
+        try:
+            response = post_with_hedging(url, headers, data, timeout=timeout)
+        except requests.RequestException as e:
+            return f"Error: {e}"
+    else:
+        response = requests.post(url, headers=headers, json=data, timeout=timeout)
     # Show raw response for debugging
     print('Gemini API raw response:', response.text)
     if response.status_code == 200:
@@ -44,374 +177,19 @@ def generate_questions_gemini(api_key, material, params):
     else:
         return f"Error: {response.text}"
 
-def create_pdf(questions, total_marks, subject="Fundamentals of AI", exam_title="LJ Polytechnic", time="2 Hours"):
-    from io import BytesIO
-    from reportlab.lib import colors
-    from reportlab.lib.utils import simpleSplit
-    buffer = BytesIO()
-    c = canvas.Canvas(buffer, pagesize=A4)
-    width, height = A4
-    # Attractive Header: colored bar, bold fonts
-    c.setFillColor(colors.HexColor('#003366'))
-    c.rect(0, height-90, width, 70, fill=1, stroke=0)
-    c.setFillColor(colors.white)
-    c.setFont("Helvetica-Bold", 20)
-    c.drawString(35, height-40, exam_title)
-    c.setFont("Helvetica", 13)
-    c.drawRightString(width-35, height-40, f"Time: {time}")
-    # Centered subject in blue bar
-    sanitized_subject = subject.split('#')[0].strip()
-    c.setFont("Helvetica-Bold", 16)
-    subject_width = c.stringWidth(sanitized_subject, "Helvetica-Bold", 16)
-    c.drawString((width - subject_width) / 2, height-60, sanitized_subject)
-    # Centered total marks in blue bar
-    c.setFont("Helvetica-Bold", 13)
-    total_marks_text = f"Total Marks: {total_marks}"
-    marks_width = c.stringWidth(total_marks_text, "Helvetica-Bold", 13)
-    c.drawString((width - marks_width) / 2, height-78, total_marks_text)
-    c.setFillColor(colors.black)
-    y = height - 105
-    # Instructions box
-    c.setStrokeColor(colors.HexColor('#003366'))
-    c.setLineWidth(1)
-    c.roundRect(25, y-40, width-50, 40, 8, stroke=1, fill=0)
-    c.setFont("Helvetica-Bold", 12)
-    c.drawString(35, y-18, "Instructions:")
-    c.setFont("Helvetica", 12)
-    c.drawString(55, y-32, "1. Answer all questions.  2. Marks are indicated against each question.")
-    y -= 60
-    # Section headers and instructions (only once per section)
-    section_headers = {
-        'A': ("Section - A", "Multiple Choice Questions (10 Marks)", "Attempt all questions. Choose the correct option."),
-        'B': ("Section - B", "One-liner Questions (10 Marks) (1 mark each)", None),
-        'C': ("Section - C", "Short Questions (10 Marks)", "Answer the following (2 marks each):"),
-        'D': ("Section - D", "Descriptive Questions (20 Marks)", "Answer any 4 out of the following 5 questions (5 marks each):")
-    }
-    section = 'A'
-    q_num = 1
-    in_mcq = True
-    in_very_short = False
-    in_short = False
-    in_desc = False
-    shown_sections = set()
-    questions = questions.replace('\r\n', '\n').replace('\r', '\n')
-    lines = questions.split('\n')
-    mcq_pattern = re.compile(r'^(\d+)[\).:\- ]+(.+)')
-    # --- SEGMENT QUESTIONS INTO SECTIONS ---
-    # We'll use simple heuristics to segment questions by marks and type
-    section_a = []  # MCQs (1 mark)
-    section_b = []  # One-liners (1 mark)
-    section_c = []  # Short (2 marks)
-    section_d = []  # Long/Descriptive (5 marks)
-    current_section = None
-    for line in lines:
-        l = line.strip()
-        if not l:
-            continue
-        # Heuristic: MCQ options (a), b), etc.)
-        if l and (l[0] in 'abcd' and (l[1:3] == ') ' or l[1:2] == '.' or l[1:2] == '-')):
-            if current_section == 'A' and section_a:
-                section_a[-1].append(l)
-            continue
-        # MCQ question (1 mark)
-        if re.match(r"^\d+[\).:\- ]+.*", l) and 'mark' not in l.lower() and 'short' not in l.lower() and 'long' not in l.lower():
-            section_a.append([l])
-            current_section = 'A'
-            continue
-        # One-liner (1 mark)
-        if ('one-liner' in l.lower() or 'very short' in l.lower() or '1 mark' in l.lower()) and not l.lower().startswith('section'):
-            section_b.append(l)
-            current_section = 'B'
-            continue
-        # Short (2 marks)
-        if ('2 mark' in l.lower() or 'short' in l.lower()) and not l.lower().startswith('section'):
-            section_c.append(l)
-            current_section = 'C'
-            continue
-        # Long/Descriptive (5 marks)
-        if ('5 mark' in l.lower() or 'long' in l.lower() or 'descriptive' in l.lower()) and not l.lower().startswith('section'):
-            section_d.append(l)
-            current_section = 'D'
-            continue
-        # Fallback: if in a section, treat as question
-        if current_section == 'A':
-            section_a[-1].append(l)
-        elif current_section == 'B':
-            section_b.append(l)
-        elif current_section == 'C':
-            section_c.append(l)
-        elif current_section == 'D':
-            section_d.append(l)
-    # --- RENDER SECTIONS IN ORDER WITH SPACING AND CLEAR SEGMENTATION ---
-    def render_section(title, subtitle, instructions, questions, is_mcq=False, y=y):
-        nonlocal c
-        # Add extra space before each section for clarity
-        y -= 25
-        if y < 100:
-            c.showPage()
-            y = height - 60
-        c.setFillColor(colors.HexColor('#003366'))
-        c.setFont("Helvetica-Bold", 15)
-        c.drawString(30, y, title)
-        y -= 20
-        c.setFillColor(colors.black)
-        c.setFont("Helvetica-Bold", 12)
-        c.drawString(30, y, subtitle)
-        y -= 16
-        if instructions:
-            c.setFont("Helvetica-Oblique", 11)
-            c.drawString(30, y, instructions)
-            y -= 16
-        # Render questions
-        for q in questions:
-            if is_mcq:
-                # q is a list: [question, option1, option2, ...]
-                wrapped = simpleSplit(q[0], "Helvetica", 12, 500)
-                for wline in wrapped:
-                    if y < 60:
-                        c.showPage()
-                        c.setFont("Helvetica", 12)
-                        y = height - 40
-                    c.setFont("Helvetica", 12)
-                    c.drawString(30, y, wline)
-                    y -= 16
-                for opt in q[1:]:
-                    wrapped_opt = simpleSplit(opt, "Helvetica", 12, 470)
-                    for wline in wrapped_opt:
-                        if y < 40:
-                            c.showPage()
-                            c.setFont("Helvetica", 12)
-                            y = height - 40
-                        c.drawString(70, y, wline)
-                        y -= 14
-            else:
-                wrapped = simpleSplit(q, "Helvetica", 12, 500)
-                for wline in wrapped:
-                    if y < 60:
-                        c.showPage()
-                        c.setFont("Helvetica", 12)
-                        y = height - 40
-                    c.setFont("Helvetica", 12)
-                    c.drawString(30, y, wline)
-                    y -= 18
-        # Add extra space after each section
-        y -= 10
-        return y
-    # Render all sections in order, with clear spacing
-    y = render_section("Section - A", "Multiple Choice Questions (10 Marks)", "Attempt all questions. Choose the correct option.", section_a, is_mcq=True, y=y)
-    y = render_section("Section - B", "One-liner Questions (10 Marks) (1 mark each)", None, section_b, y=y)
-    y = render_section("Section - C", "Short Questions (10 Marks)", "Answer the following (2 marks each):", section_c, y=y)
-    y = render_section("Section - D", "Descriptive Questions (20 Marks)", "Answer any 4 out of the following 5 questions (5 marks each):", section_d, y=y)
-    c.save()
-    buffer.seek(0)
-    return buffer
+@st.cache_resource
+def get_export_pool():
+    # Renderers are CPU-bound, so only a process pool on a multi-core host helps
+    workers = min(len(POOLED_EXPORT_FORMATS), os.cpu_count() or 1)
+    return make_export_pool(workers) if workers > 1 else None
 
-def create_pdf_from_inputs(mcqs, one_liners, shorts, longs, total_marks, subject="Fundamentals of AI", exam_title="LJ Polytechnic", time="2 Hours"):
-    from io import BytesIO
-    from reportlab.lib import colors
-    from reportlab.lib.utils import simpleSplit
-    buffer = BytesIO()
-    c = canvas.Canvas(buffer, pagesize=A4)
-    width, height = A4
-    # Attractive Header: colored bar, bold fonts
-    c.setFillColor(colors.HexColor('#003366'))
-    c.rect(0, height-70, width, 50, fill=1, stroke=0)
-    c.setFillColor(colors.white)
-    c.setFont("Helvetica-Bold", 20)
-    c.drawString(35, height-40, exam_title)
-    c.setFont("Helvetica", 13)
-    c.drawRightString(width-35, height-40, f"Time: {time}")
-    # Centered subject in blue bar
-    sanitized_title = subject.split('#')[0].strip()
-    c.setFont("Helvetica-Bold", 16)
-    title_width = c.stringWidth(sanitized_title, "Helvetica-Bold", 16)
-    c.drawString((width - title_width) / 2, height-60, sanitized_title)
-    c.setFillColor(colors.black)
-    y = height - 95
-    # Instructions box
-    c.setStrokeColor(colors.HexColor('#003366'))
-    c.setLineWidth(1)
-    c.roundRect(25, y-40, width-50, 40, 8, stroke=1, fill=0)
-    c.setFont("Helvetica-Bold", 12)
-    c.drawString(35, y-18, "Instructions:")
-    c.setFont("Helvetica", 12)
-    c.drawString(55, y-32, "1. Answer all questions.  2. Marks are indicated against each question.")
-    y -= 70
-    def render_section(title, subtitle, instructions, questions, is_mcq=False, y=y):
-        nonlocal c
-        # Add extra vertical space before section
-        y -= 20
-        if y < 120:
-            c.showPage()
-            y = height - 60
-        c.setFillColor(colors.HexColor('#003366'))
-        c.setFont("Helvetica-Bold", 14)
-        c.drawString(30, y, title)
-        y -= 18
-        c.setFillColor(colors.black)
-        c.setFont("Helvetica", 12)
-        c.drawString(30, y, subtitle)
-        y -= 16
-        if instructions:
-            c.setFont("Helvetica-Oblique", 11)
-            c.drawString(30, y, instructions)
-            y -= 16
-        # Render questions
-        q_num = 1
-        for q in questions:
-            if is_mcq:
-                # q: question + options (split by lines)
-                lines = q.strip().split('\n')
-                if not lines:
-                    continue
-                # Question
-                wrapped = simpleSplit(f"{q_num}. {lines[0]}", "Helvetica", 12, 500)
-                for wline in wrapped:
-                    if y < 60:
-                        c.showPage()
-                        c.setFont("Helvetica", 12)
-                        y = height - 40
-                    c.drawString(30, y, wline)
-                    y -= 16
-                # Options
-                for opt in lines[1:]:
-                    wrapped_opt = simpleSplit(opt, "Helvetica", 12, 470)
-                    for wline in wrapped_opt:
-                        if y < 40:
-                            c.showPage()
-                            c.setFont("Helvetica", 12)
-                            y = height - 40
-                        c.drawString(70, y, wline)
-                        y -= 14
-                q_num += 1
-            else:
-                wrapped = simpleSplit(f"{q_num}. {q.strip()}", "Helvetica", 12, 500)
-                for wline in wrapped:
-                    if y < 60:
-                        c.showPage()
-                        c.setFont("Helvetica", 12)
-                        y = height - 40
-                    c.drawString(30, y, wline)
-                    y -= 18
-                q_num += 1
-        # Add extra vertical space after section
-        return y - 20
-    # Render all sections in order
-    y = render_section("Section - A", "Multiple Choice Questions (10 Marks)", "Attempt all questions. Choose the correct option.", mcqs, is_mcq=True, y=y)
-    y = render_section("Section - B", "One-liner Questions (10 Marks) (1 mark each)", None, one_liners, y=y)
-    y = render_section("Section - C", "Short Questions (10 Marks)", "Answer the following (2 marks each):", shorts, y=y)
-    y = render_section("Section - D", "Descriptive Questions (20 Marks)", "Answer any 4 out of the following 5 questions (5 marks each):", longs, y=y)
-    c.save()
-    buffer.seek(0)
-    return buffer
-
-def create_pdf_from_inputs_preserve_format(raw_text, file_title="Question Paper", exam_title="LJ Polytechnic", time="2 Hours", total_marks=None):
-    from io import BytesIO
-    from reportlab.lib import colors
-    buffer = BytesIO()
-    c = canvas.Canvas(buffer, pagesize=A4)
-    width, height = A4
-    # Header (blue bar with centered subject and total marks)
-    c.setFillColor(colors.HexColor('#003366'))
-    c.rect(0, height-90, width, 70, fill=1, stroke=0)
-    c.setFillColor(colors.white)
-    c.setFont("Helvetica-Bold", 20)
-    c.drawString(35, height-40, exam_title)
-    c.setFont("Helvetica", 13)
-    c.drawRightString(width-35, height-40, f"Time: {time}")
-    # Centered subject in blue bar
-    sanitized_title = file_title.split('#')[0].strip()
-    c.setFont("Helvetica-Bold", 16)
-    title_width = c.stringWidth(sanitized_title, "Helvetica-Bold", 16)
-    c.drawString((width - title_width) / 2, height-60, sanitized_title)
-    # Centered total marks in blue bar (if provided)
-    if total_marks is not None:
-        c.setFont("Helvetica-Bold", 13)
-        total_marks_text = f"Total Marks: {total_marks}"
-        marks_width = c.stringWidth(total_marks_text, "Helvetica-Bold", 13)
-        c.drawString((width - marks_width) / 2, height-78, total_marks_text)
-    c.setFillColor(colors.black)
-    y = height - 105
-    # Remove unwanted lines from raw_text
-    lines = raw_text.replace('**', '').replace('##', '').split('\n')
-    skip_patterns = [
-        r"^lj polytechnic$",
-        r"^fundamentals of ai.*question paper$"
-    ]
-    import re
-    filtered_lines = []
-    for line in lines:
-        l = line.strip().lower()
-        if any(re.match(pat, l) for pat in skip_patterns):
-            continue
-        filtered_lines.append(line)
-    # Use Times New Roman for all body lines, wrap text to fit page
-    font_name = "Times-Roman"
-    c.setFont(font_name, 12)
-    max_width = width - 60  # 30pt margin left/right
-    section_header_pattern = re.compile(r"^\s*Section\s*[-:]?\s*[A-Z][\s:.-]*", re.IGNORECASE)
-    for line in filtered_lines:
-        # Detect section header (e.g., Section A:, Section - A, Section A)
-        if section_header_pattern.match(line.strip()):
-            # Center and bold section header
-            if y < 60:
-                c.showPage()
-                c.setFont("Helvetica-Bold", 14)
-                y = height - 40
-            c.setFont("Helvetica-Bold", 14)
-            text = line.strip()
-            text_width = c.stringWidth(text, "Helvetica-Bold", 14)
-            c.drawString((width - text_width) / 2, y, text)
-            y -= 22
-            c.setFont(font_name, 12)
-            continue
-        # Wrap line if too long
-        words = line.split(' ')
-        current_line = ''
-        for word in words:
-            test_line = (current_line + ' ' + word).strip()
-            if c.stringWidth(test_line, font_name, 12) > max_width:
-                if y < 60:
-                    c.showPage()
-                    c.setFont(font_name, 12)
-                    y = height - 40
-                c.drawString(30, y, current_line)
-                y -= 16
-                current_line = word
-            else:
-                current_line = test_line
-        if current_line:
-            if y < 60:
-                c.showPage()
-                c.setFont(font_name, 12)
-                y = height - 40
-            c.drawString(30, y, current_line)
-            y -= 16
-    c.save()
-    buffer.seek(0)
-    return buffer
-
-def create_docx_from_inputs_preserve_format(raw_text, file_title="Question Paper"): 
-    from docx import Document
-    from docx.shared import Pt
-    from docx.oxml.ns import qn
-    from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
-    doc = Document()
-    # Title
-    title = doc.add_paragraph()
-    run = title.add_run(file_title)
-    run.bold = True
-    run.font.size = Pt(18)
-    title.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-    # Add a blank line
-    doc.add_paragraph("")
-    # Add the rest of the content, preserving formatting
-    lines = raw_text.replace('**', '').replace('##', '').split('\n')
-    for line in lines:
-        p = doc.add_paragraph()
-        run = p.add_run(line.replace('\t', '    '))
-        run.font.size = Pt(12)
-    return doc
+def build_export_bundle_bytes(questions, total_marks, subject, rendered):
+    # Deferred download: build the ZIP on disk, then hand Streamlit the bytes
+    with tempfile.TemporaryFile(suffix=".zip") as bundle:
+        create_export_bundle(questions, total_marks, bundle, subject=subject,
+                             rendered=rendered, executor=get_export_pool())
+        bundle.seek(0)
+        return bundle.read()
 
 def init_db():
     conn = sqlite3.connect('users.db')
@@ -587,6 +365,7 @@ def main():
         one_liner_count = st.number_input("Number of 1-mark One-liners", min_value=0, value=5)
         short_count = st.number_input("Number of 2-mark Questions", min_value=0, value=5)
         long_count = st.number_input("Number of 5-mark Questions", min_value=0, value=2)
+        hedge = st.checkbox("Retry slow requests in parallel (hedging)", value=False, key="ai_hedge")
         if st.button("Generate Question Paper", key="ai_gen_btn"):
             if not api_key:
                 st.error("API key is not set. Please contact the administrator.")
@@ -609,7 +388,10 @@ def main():
                 "long_count": long_count
             }
             with st.spinner("Generating questions..."):
-                questions = generate_questions_gemini(api_key, material, params)
+                questions = generate_questions_gemini(api_key, material, params, hedge=hedge, timeout=120 if hedge else None)
+            if hedge:
+                latency = get_gemini_latency_stats().summary()
+                st.caption(f"p99 latency: {latency['p99']:.1f}s · hedge rate: {latency['hedge_rate']:.0%} ({latency['hedges']}/{latency['calls']} calls)")
             # Remove common AI intro lines and extra headers
             if questions:
                 lines = questions.split('\n')
@@ -653,6 +435,15 @@ def main():
                 file_name=f"question_paper_{datetime.date.today().strftime('%Y%m%d')}_preserve.pdf",
                 mime="application/pdf"
             )
+            # Export all formats as one ZIP, built only when the button is clicked
+            # and reusing the two PDFs rendered above
+            rendered = {"exam_pdf": pdf_file, "preserve_pdf": pdf_preserve}
+            st.download_button(
+                label="Export All (ZIP)",
+                data=lambda: build_export_bundle_bytes(questions, total_marks, subject, rendered),
+                file_name=f"question_paper_{datetime.date.today().strftime('%Y%m%d')}_all.zip",
+                mime="application/zip"
+            )
     with tab2:
         st.markdown("**Manual Input (Paste your full formatted question paper below. All formatting is preserved.)**")
         manual_text = st.text_area("Manual Question Paper Input", height=800, key="manual_full_text")
@@ -690,10 +481,7 @@ def main():
                 if not raw_text.strip():
                     st.warning("Please paste your formatted question paper.")
                 else:
-                    docx_obj = create_docx_from_inputs_preserve_format(raw_text, file_title=file_title)
-                    docx_buffer = io.BytesIO()
-                    docx_obj.save(docx_buffer)
-                    docx_buffer.seek(0)
+                    docx_buffer = create_docx_bulk_preserve_format(raw_text, file_title=file_title)
                     st.download_button(
                         label="Download as DOCX",
                         data=docx_buffer,
@@ -0,0 +1,54 @@
+# Times the bulk DOCX writer against the per-run python-docx writer on a
+# 5,000-line paper, including saving to a buffer.
+# Run from the repository root: python benchmarks/bench_docx_writer.py
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import renderers
+
+LINES = 5000
+REPEAT = 3
+
+
+def make_paper(count):
+    lines = []
+    for i in range(count):
+        if i % 1000 == 0:
+            lines.append(f"**Section - {'ABCDE'[i // 1000]}:** Questions")
+        elif i % 7:
+            lines.append(f"{i}.\tExplain concept <{i}> & its \"role\" in AI systems (2 marks)")
+        else:
+            lines.append("")
+    return "\n".join(lines)
+
+
+def old_writer(raw_text):
+    buffer = io.BytesIO()
+    renderers.create_docx_from_inputs_preserve_format(raw_text, file_title="Benchmark").save(buffer)
+    return buffer
+
+
+def bulk_writer(raw_text):
+    return renderers.create_docx_bulk_preserve_format(raw_text, file_title="Benchmark")
+
+
+def best_of(func, raw_text):
+    timings = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        func(raw_text)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+if __name__ == "__main__":
+    paper = make_paper(LINES)
+    old = best_of(old_writer, paper)
+    bulk = best_of(bulk_writer, paper)
+    print(f"{LINES} lines, best of {REPEAT}")
+    print(f"  create_docx_from_inputs_preserve_format  {old:.3f}s")
+    print(f"  create_docx_bulk_preserve_format         {bulk:.3f}s")
+    print(f"  speedup                                  {old / bulk:.1f}x")
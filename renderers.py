@@ -0,0 +1,511 @@
+import datetime
+import io
+import multiprocessing
+import os
+import re
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, wait
+from xml.sax.saxutils import escape as xml_escape
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+
+# Section headers such as "Section A:", "Section - A" or "Section A"
+SECTION_HEADER_PATTERN = re.compile(r"^\s*Section\s*[-:]?\s*[A-Z][\s:.-]*", re.IGNORECASE)
+# Characters that are not allowed in WordprocessingML text
+XML_INVALID_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+def create_pdf(questions, total_marks, subject="Fundamentals of AI", exam_title="LJ Polytechnic", time="2 Hours"):
+    from io import BytesIO
+    from reportlab.lib import colors
+    from reportlab.lib.utils import simpleSplit
+    buffer = BytesIO()
+    c = canvas.Canvas(buffer, pagesize=A4)
+    width, height = A4
+    # Attractive Header: colored bar, bold fonts
+    c.setFillColor(colors.HexColor('#003366'))
+    c.rect(0, height-90, width, 70, fill=1, stroke=0)
+    c.setFillColor(colors.white)
+    c.setFont("Helvetica-Bold", 20)
+    c.drawString(35, height-40, exam_title)
+    c.setFont("Helvetica", 13)
+    c.drawRightString(width-35, height-40, f"Time: {time}")
+    # Centered subject in blue bar
+    sanitized_subject = subject.split('#')[0].strip()
+    c.setFont("Helvetica-Bold", 16)
+    subject_width = c.stringWidth(sanitized_subject, "Helvetica-Bold", 16)
+    c.drawString((width - subject_width) / 2, height-60, sanitized_subject)
+    # Centered total marks in blue bar
+    c.setFont("Helvetica-Bold", 13)
+    total_marks_text = f"Total Marks: {total_marks}"
+    marks_width = c.stringWidth(total_marks_text, "Helvetica-Bold", 13)
+    c.drawString((width - marks_width) / 2, height-78, total_marks_text)
+    c.setFillColor(colors.black)
+    y = height - 105
+    # Instructions box
+    c.setStrokeColor(colors.HexColor('#003366'))
+    c.setLineWidth(1)
+    c.roundRect(25, y-40, width-50, 40, 8, stroke=1, fill=0)
+    c.setFont("Helvetica-Bold", 12)
+    c.drawString(35, y-18, "Instructions:")
+    c.setFont("Helvetica", 12)
+    c.drawString(55, y-32, "1. Answer all questions.  2. Marks are indicated against each question.")
+    y -= 60
+    # Section headers and instructions (only once per section)
+    section_headers = {
+        'A': ("Section - A", "Multiple Choice Questions (10 Marks)", "Attempt all questions. Choose the correct option."),
+        'B': ("Section - B", "One-liner Questions (10 Marks) (1 mark each)", None),
+        'C': ("Section - C", "Short Questions (10 Marks)", "Answer the following (2 marks each):"),
+        'D': ("Section - D", "Descriptive Questions (20 Marks)", "Answer any 4 out of the following 5 questions (5 marks each):")
+    }
+    section = 'A'
+    q_num = 1
+    in_mcq = True
+    in_very_short = False
+    in_short = False
+    in_desc = False
+    shown_sections = set()
+    questions = questions.replace('\r\n', '\n').replace('\r', '\n')
+    lines = questions.split('\n')
+    mcq_pattern = re.compile(r'^(\d+)[\).:\- ]+(.+)')
+    # --- SEGMENT QUESTIONS INTO SECTIONS ---
+    # We'll use simple heuristics to segment questions by marks and type
+    section_a = []  # MCQs (1 mark)
+    section_b = []  # One-liners (1 mark)
+    section_c = []  # Short (2 marks)
+    section_d = []  # Long/Descriptive (5 marks)
+    current_section = None
+    for line in lines:
+        l = line.strip()
+        if not l:
+            continue
+        # Heuristic: MCQ options (a), b), etc.)
+        if l and (l[0] in 'abcd' and (l[1:3] == ') ' or l[1:2] == '.' or l[1:2] == '-')):
+            if current_section == 'A' and section_a:
+                section_a[-1].append(l)
+            continue
+        # MCQ question (1 mark)
+        if re.match(r"^\d+[\).:\- ]+.*", l) and 'mark' not in l.lower() and 'short' not in l.lower() and 'long' not in l.lower():
+            section_a.append([l])
+            current_section = 'A'
+            continue
+        # One-liner (1 mark)
+        if ('one-liner' in l.lower() or 'very short' in l.lower() or '1 mark' in l.lower()) and not l.lower().startswith('section'):
+            section_b.append(l)
+            current_section = 'B'
+            continue
+        # Short (2 marks)
+        if ('2 mark' in l.lower() or 'short' in l.lower()) and not l.lower().startswith('section'):
+            section_c.append(l)
+            current_section = 'C'
+            continue
+        # Long/Descriptive (5 marks)
+        if ('5 mark' in l.lower() or 'long' in l.lower() or 'descriptive' in l.lower()) and not l.lower().startswith('section'):
+            section_d.append(l)
+            current_section = 'D'
+            continue
+        # Fallback: if in a section, treat as question
+        if current_section == 'A':
+            section_a[-1].append(l)
+        elif current_section == 'B':
+            section_b.append(l)
+        elif current_section == 'C':
+            section_c.append(l)
+        elif current_section == 'D':
+            section_d.append(l)
+    # --- RENDER SECTIONS IN ORDER WITH SPACING AND CLEAR SEGMENTATION ---
+    def render_section(title, subtitle, instructions, questions, is_mcq=False, y=y):
+        nonlocal c
+        # Add extra space before each section for clarity
+        y -= 25
+        if y < 100:
+            c.showPage()
+            y = height - 60
+        c.setFillColor(colors.HexColor('#003366'))
+        c.setFont("Helvetica-Bold", 15)
+        c.drawString(30, y, title)
+        y -= 20
+        c.setFillColor(colors.black)
+        c.setFont("Helvetica-Bold", 12)
+        c.drawString(30, y, subtitle)
+        y -= 16
+        if instructions:
+            c.setFont("Helvetica-Oblique", 11)
+            c.drawString(30, y, instructions)
+            y -= 16
+        # Render questions
+        for q in questions:
+            if is_mcq:
+                # q is a list: [question, option1, option2, ...]
+                wrapped = simpleSplit(q[0], "Helvetica", 12, 500)
+                for wline in wrapped:
+                    if y < 60:
+                        c.showPage()
+                        c.setFont("Helvetica", 12)
+                        y = height - 40
+                    c.setFont("Helvetica", 12)
+                    c.drawString(30, y, wline)
+                    y -= 16
+                for opt in q[1:]:
+                    wrapped_opt = simpleSplit(opt, "Helvetica", 12, 470)
+                    for wline in wrapped_opt:
+                        if y < 40:
+                            c.showPage()
+                            c.setFont("Helvetica", 12)
+                            y = height - 40
+                        c.drawString(70, y, wline)
+                        y -= 14
+            else:
+                wrapped = simpleSplit(q, "Helvetica", 12, 500)
+                for wline in wrapped:
+                    if y < 60:
+                        c.showPage()
+                        c.setFont("Helvetica", 12)
+                        y = height - 40
+                    c.setFont("Helvetica", 12)
+                    c.drawString(30, y, wline)
+                    y -= 18
+        # Add extra space after each section
+        y -= 10
+        return y
+    # Render all sections in order, with clear spacing
+    y = render_section("Section - A", "Multiple Choice Questions (10 Marks)", "Attempt all questions. Choose the correct option.", section_a, is_mcq=True, y=y)
+    y = render_section("Section - B", "One-liner Questions (10 Marks) (1 mark each)", None, section_b, y=y)
+    y = render_section("Section - C", "Short Questions (10 Marks)", "Answer the following (2 marks each):", section_c, y=y)
+    y = render_section("Section - D", "Descriptive Questions (20 Marks)", "Answer any 4 out of the following 5 questions (5 marks each):", section_d, y=y)
+    c.save()
+    buffer.seek(0)
+    return buffer
+
+def create_pdf_from_inputs(mcqs, one_liners, shorts, longs, total_marks, subject="Fundamentals of AI", exam_title="LJ Polytechnic", time="2 Hours"):
+    from io import BytesIO
+    from reportlab.lib import colors
+    from reportlab.lib.utils import simpleSplit
+    buffer = BytesIO()
+    c = canvas.Canvas(buffer, pagesize=A4)
+    width, height = A4
+    # Attractive Header: colored bar, bold fonts
+    c.setFillColor(colors.HexColor('#003366'))
+    c.rect(0, height-70, width, 50, fill=1, stroke=0)
+    c.setFillColor(colors.white)
+    c.setFont("Helvetica-Bold", 20)
+    c.drawString(35, height-40, exam_title)
+    c.setFont("Helvetica", 13)
+    c.drawRightString(width-35, height-40, f"Time: {time}")
+    # Centered subject in blue bar
+    sanitized_title = subject.split('#')[0].strip()
+    c.setFont("Helvetica-Bold", 16)
+    title_width = c.stringWidth(sanitized_title, "Helvetica-Bold", 16)
+    c.drawString((width - title_width) / 2, height-60, sanitized_title)
+    c.setFillColor(colors.black)
+    y = height - 95
+    # Instructions box
+    c.setStrokeColor(colors.HexColor('#003366'))
+    c.setLineWidth(1)
+    c.roundRect(25, y-40, width-50, 40, 8, stroke=1, fill=0)
+    c.setFont("Helvetica-Bold", 12)
+    c.drawString(35, y-18, "Instructions:")
+    c.setFont("Helvetica", 12)
+    c.drawString(55, y-32, "1. Answer all questions.  2. Marks are indicated against each question.")
+    y -= 70
+    def render_section(title, subtitle, instructions, questions, is_mcq=False, y=y):
+        nonlocal c
+        # Add extra vertical space before section
+        y -= 20
+        if y < 120:
+            c.showPage()
+            y = height - 60
+        c.setFillColor(colors.HexColor('#003366'))
+        c.setFont("Helvetica-Bold", 14)
+        c.drawString(30, y, title)
+        y -= 18
+        c.setFillColor(colors.black)
+        c.setFont("Helvetica", 12)
+        c.drawString(30, y, subtitle)
+        y -= 16
+        if instructions:
+            c.setFont("Helvetica-Oblique", 11)
+            c.drawString(30, y, instructions)
+            y -= 16
+        # Render questions
+        q_num = 1
+        for q in questions:
+            if is_mcq:
+                # q: question + options (split by lines)
+                lines = q.strip().split('\n')
+                if not lines:
+                    continue
+                # Question
+                wrapped = simpleSplit(f"{q_num}. {lines[0]}", "Helvetica", 12, 500)
+                for wline in wrapped:
+                    if y < 60:
+                        c.showPage()
+                        c.setFont("Helvetica", 12)
+                        y = height - 40
+                    c.drawString(30, y, wline)
+                    y -= 16
+                # Options
+                for opt in lines[1:]:
+                    wrapped_opt = simpleSplit(opt, "Helvetica", 12, 470)
+                    for wline in wrapped_opt:
+                        if y < 40:
+                            c.showPage()
+                            c.setFont("Helvetica", 12)
+                            y = height - 40
+                        c.drawString(70, y, wline)
+                        y -= 14
+                q_num += 1
+            else:
+                wrapped = simpleSplit(f"{q_num}. {q.strip()}", "Helvetica", 12, 500)
+                for wline in wrapped:
+                    if y < 60:
+                        c.showPage()
+                        c.setFont("Helvetica", 12)
+                        y = height - 40
+                    c.drawString(30, y, wline)
+                    y -= 18
+                q_num += 1
+        # Add extra vertical space after section
+        return y - 20
+    # Render all sections in order
+    y = render_section("Section - A", "Multiple Choice Questions (10 Marks)", "Attempt all questions. Choose the correct option.", mcqs, is_mcq=True, y=y)
+    y = render_section("Section - B", "One-liner Questions (10 Marks) (1 mark each)", None, one_liners, y=y)
+    y = render_section("Section - C", "Short Questions (10 Marks)", "Answer the following (2 marks each):", shorts, y=y)
+    y = render_section("Section - D", "Descriptive Questions (20 Marks)", "Answer any 4 out of the following 5 questions (5 marks each):", longs, y=y)
+    c.save()
+    buffer.seek(0)
+    return buffer
+
+def create_pdf_from_inputs_preserve_format(raw_text, file_title="Question Paper", exam_title="LJ Polytechnic", time="2 Hours", total_marks=None):
+    from io import BytesIO
+    from reportlab.lib import colors
+    buffer = BytesIO()
+    c = canvas.Canvas(buffer, pagesize=A4)
+    width, height = A4
+    # Header (blue bar with centered subject and total marks)
+    c.setFillColor(colors.HexColor('#003366'))
+    c.rect(0, height-90, width, 70, fill=1, stroke=0)
+    c.setFillColor(colors.white)
+    c.setFont("Helvetica-Bold", 20)
+    c.drawString(35, height-40, exam_title)
+    c.setFont("Helvetica", 13)
+    c.drawRightString(width-35, height-40, f"Time: {time}")
+    # Centered subject in blue bar
+    sanitized_title = file_title.split('#')[0].strip()
+    c.setFont("Helvetica-Bold", 16)
+    title_width = c.stringWidth(sanitized_title, "Helvetica-Bold", 16)
+    c.drawString((width - title_width) / 2, height-60, sanitized_title)
+    # Centered total marks in blue bar (if provided)
+    if total_marks is not None:
+        c.setFont("Helvetica-Bold", 13)
+        total_marks_text = f"Total Marks: {total_marks}"
+        marks_width = c.stringWidth(total_marks_text, "Helvetica-Bold", 13)
+        c.drawString((width - marks_width) / 2, height-78, total_marks_text)
+    c.setFillColor(colors.black)
+    y = height - 105
+    # Remove unwanted lines from raw_text
+    lines = raw_text.replace('**', '').replace('##', '').split('\n')
+    skip_patterns = [
+        r"^lj polytechnic$",
+        r"^fundamentals of ai.*question paper$"
+    ]
+    import re
+    filtered_lines = []
+    for line in lines:
+        l = line.strip().lower()
+        if any(re.match(pat, l) for pat in skip_patterns):
+            continue
+        filtered_lines.append(line)
+    # Use Times New Roman for all body lines, wrap text to fit page
+    font_name = "Times-Roman"
+    c.setFont(font_name, 12)
+    max_width = width - 60  # 30pt margin left/right
+    for line in filtered_lines:
+        # Detect section header (e.g., Section A:, Section - A, Section A)
+        if SECTION_HEADER_PATTERN.match(line.strip()):
+            # Center and bold section header
+            if y < 60:
+                c.showPage()
+                c.setFont("Helvetica-Bold", 14)
+                y = height - 40
+            c.setFont("Helvetica-Bold", 14)
+            text = line.strip()
+            text_width = c.stringWidth(text, "Helvetica-Bold", 14)
+            c.drawString((width - text_width) / 2, y, text)
+            y -= 22
+            c.setFont(font_name, 12)
+            continue
+        # Wrap line if too long
+        words = line.split(' ')
+        current_line = ''
+        for word in words:
+            test_line = (current_line + ' ' + word).strip()
+            if c.stringWidth(test_line, font_name, 12) > max_width:
+                if y < 60:
+                    c.showPage()
+                    c.setFont(font_name, 12)
+                    y = height - 40
+                c.drawString(30, y, current_line)
+                y -= 16
+                current_line = word
+            else:
+                current_line = test_line
+        if current_line:
+            if y < 60:
+                c.showPage()
+                c.setFont(font_name, 12)
+                y = height - 40
+            c.drawString(30, y, current_line)
+            y -= 16
+    c.save()
+    buffer.seek(0)
+    return buffer
+
+def create_docx_from_inputs_preserve_format(raw_text, file_title="Question Paper"): 
+    from docx import Document
+    from docx.shared import Pt
+    from docx.oxml.ns import qn
+    from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
+    doc = Document()
+    # Title
+    title = doc.add_paragraph()
+    run = title.add_run(file_title)
+    run.bold = True
+    run.font.size = Pt(18)
+    title.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
+    # Add a blank line
+    doc.add_paragraph("")
+    # Add the rest of the content, preserving formatting
+    lines = raw_text.replace('**', '').replace('##', '').split('\n')
+    for line in lines:
+        p = doc.add_paragraph()
+        run = p.add_run(line.replace('\t', '    '))
+        run.font.size = Pt(12)
+    return doc
+
+def create_docx_bulk_preserve_format(raw_text, file_title="Question Paper"):
+    from docx import Document
+    from docx.shared import Pt
+    from docx.oxml import parse_xml
+    from docx.oxml.ns import nsdecls
+    from docx.enum.style import WD_STYLE_TYPE
+    from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
+    from io import BytesIO
+    doc = Document()
+    # Define styles once instead of setting fonts on every run
+    doc.styles['Normal'].font.size = Pt(12)
+    title_style = doc.styles.add_style('Paper Title', WD_STYLE_TYPE.PARAGRAPH)
+    title_style.base_style = doc.styles['Normal']
+    title_style.font.bold = True
+    title_style.font.size = Pt(18)
+    title_style.paragraph_format.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
+    section_style = doc.styles.add_style('Paper Section', WD_STYLE_TYPE.PARAGRAPH)
+    section_style.base_style = doc.styles['Normal']
+    section_style.font.bold = True
+    section_style.font.size = Pt(14)
+    section_style.paragraph_format.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
+    def paragraph_xml(text, style_id=None):
+        ppr = f'<w:pPr><w:pStyle w:val="{style_id}"/></w:pPr>' if style_id else ''
+        if not text:
+            return f'<w:p>{ppr}</w:p>'
+        text = xml_escape(XML_INVALID_CHARS.sub('', text))
+        return f'<w:p>{ppr}<w:r><w:t xml:space="preserve">{text}</w:t></w:r></w:p>'
+    # Build the whole body as one XML fragment and parse it in a single pass
+    parts = [paragraph_xml(file_title, title_style.style_id), paragraph_xml('')]
+    raw_text = raw_text.replace('\r\n', '\n').replace('\r', '\n')
+    lines = raw_text.replace('**', '').replace('##', '').split('\n')
+    for line in lines:
+        if SECTION_HEADER_PATTERN.match(line.strip()):
+            parts.append(paragraph_xml(line.strip(), section_style.style_id))
+        else:
+            parts.append(paragraph_xml(line.replace('\t', '    ')))
+    fragment = parse_xml(f'<w:body {nsdecls("w")}>{"".join(parts)}</w:body>')
+    body = doc.element.body
+    sect_pr = body.sectPr
+    for p in list(fragment):
+        if sect_pr is not None:
+            sect_pr.addprevious(p)
+        else:
+            body.append(p)
+    buffer = BytesIO()
+    doc.save(buffer)
+    buffer.seek(0)
+    return buffer
+
+# Formats rendered by the "Export All" bundle: file suffix for each format
+EXPORT_FORMATS = {
+    "exam_pdf": ".pdf",
+    "preserve_pdf": "_preserve.pdf",
+    "docx": ".docx",
+    "txt": ".txt",
+}
+# CPU-bound formats worth sending to a worker process; the rest are written inline
+POOLED_EXPORT_FORMATS = ("exam_pdf", "preserve_pdf", "docx")
+
+def make_export_pool(max_workers):
+    # Never fork a multi-threaded process (e.g. the Streamlit server): start
+    # workers from a clean forkserver, or spawn them where that is unavailable
+    start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context(start_method))
+
+def render_export_format(fmt, questions, total_marks, subject, out_path):
+    # Runs inside a worker: render one format and write it to out_path
+    if fmt == "exam_pdf":
+        data = create_pdf(questions, total_marks, subject=subject)
+    elif fmt == "preserve_pdf":
+        data = create_pdf_from_inputs_preserve_format(questions, file_title=subject)
+    elif fmt == "docx":
+        data = create_docx_bulk_preserve_format(questions, file_title=subject)
+    elif fmt == "txt":
+        data = io.BytesIO(questions.encode("utf-8"))
+    else:
+        raise ValueError(f"Unknown export format: {fmt}")
+    with open(out_path, "wb") as f:
+        f.write(data.getbuffer())
+    return out_path
+
+def create_export_bundle(questions, total_marks, out_file, subject="Fundamentals of AI", file_stem=None, rendered=None, executor=None):
+    # Zip every export format into out_file (a path or a binary file object).
+    # Formats already in `rendered` (format -> BytesIO) are reused; plain text
+    # is written inline and the CPU-bound formats are rendered in worker
+    # processes. Pass a shared executor to reuse one pool across many papers;
+    # without one, a pool is created per call, or the formats are rendered in
+    # this process when only one CPU is available.
+    if file_stem is None:
+        file_stem = f"question_paper_{datetime.date.today().strftime('%Y%m%d')}"
+    rendered = rendered or {}
+    unknown = set(rendered) - set(EXPORT_FORMATS)
+    if unknown:
+        raise ValueError(f"Unknown export format: {', '.join(sorted(unknown))}")
+    with tempfile.TemporaryDirectory() as out_dir:
+        paths = {fmt: os.path.join(out_dir, file_stem + suffix) for fmt, suffix in EXPORT_FORMATS.items()}
+        for fmt, data in rendered.items():
+            with open(paths[fmt], "wb") as f:
+                f.write(data.getvalue())
+        pending = [fmt for fmt in EXPORT_FORMATS if fmt not in rendered]
+        pooled = [fmt for fmt in pending if fmt in POOLED_EXPORT_FORMATS]
+        workers = min(len(pooled), os.cpu_count() or 1)
+        own_executor = executor is None and workers > 1
+        if own_executor:
+            executor = make_export_pool(workers)
+        futures = []
+        try:
+            for fmt in pending:
+                if fmt not in pooled or executor is None:
+                    render_export_format(fmt, questions, total_marks, subject, paths[fmt])
+                else:
+                    futures.append(executor.submit(render_export_format, fmt, questions, total_marks, subject, paths[fmt]))
+            for future in futures:
+                future.result()
+        finally:
+            # Workers may still be writing into out_dir: stop or finish them
+            # before the directory is removed
+            for future in futures:
+                future.cancel()
+            wait(futures)
+            if own_executor:
+                executor.shutdown(wait=True)
+        with zipfile.ZipFile(out_file, "w", zipfile.ZIP_DEFLATED) as zf:
+            for path in paths.values():
+                zf.write(path, arcname=os.path.basename(path))
+    return out_file
@@ -0,0 +1,57 @@
+# Checks the bulk DOCX writer against the per-run python-docx writer.
+# Run from the repository root: python -m pytest tests
+import io
+import os
+import sys
+
+from docx import Document
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import renderers
+
+PAPER = "\n".join([
+    "**Section - A:** Multiple Choice Questions",
+    "1. What is an agent?",
+    "a) A program\tb) A robot",
+    "",
+    "## Section B",
+    "2. Define <heuristic> & \"search\" (2 marks)",
+    "section c: Long Questions",
+    "3. Explain A* search (5 marks)",
+])
+
+
+def paragraphs(buffer):
+    return Document(buffer).paragraphs
+
+
+def old_writer_buffer(raw_text, file_title):
+    buffer = io.BytesIO()
+    renderers.create_docx_from_inputs_preserve_format(raw_text, file_title=file_title).save(buffer)
+    buffer.seek(0)
+    return buffer
+
+
+def test_text_matches_old_writer():
+    # Section headers are stripped like in the PDF path, so compare stripped text
+    old = [p.text.strip() for p in paragraphs(old_writer_buffer(PAPER, "Paper"))]
+    new = [p.text.strip() for p in paragraphs(renderers.create_docx_bulk_preserve_format(PAPER, file_title="Paper"))]
+    assert new == old
+
+
+def test_title_and_section_styles():
+    paras = paragraphs(renderers.create_docx_bulk_preserve_format(PAPER, file_title="Paper"))
+    styles = {p.text: p.style.name for p in paras}
+    assert paras[0].text == "Paper"
+    assert styles["Paper"] == "Paper Title"
+    assert styles["Section - A: Multiple Choice Questions"] == "Paper Section"
+    assert styles["Section B"] == "Paper Section"
+    assert styles["section c: Long Questions"] == "Paper Section"
+    assert styles["1. What is an agent?"] == "Normal"
+    title_style = paras[0].style
+    assert title_style.font.bold and title_style.font.size.pt == 18
+
+
+def test_carriage_returns_are_line_breaks():
+    paras = paragraphs(renderers.create_docx_bulk_preserve_format("ring\r\nbell\rend\r", file_title="T"))
+    assert [p.text for p in paras[2:]] == ["ring", "bell", "end", ""]
@@ -0,0 +1,116 @@
+# Checks the "Export All" ZIP bundle, in-process and through a worker pool.
+# Run from the repository root: python -m pytest tests
+import io
+import os
+import sys
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import renderers
+
+PAPER = "Section A\n1. What is AI?\na) x\nb) y\nSection B\n2. Define agent (1 mark)\n"
+NAMES = ["paper.pdf", "paper_preserve.pdf", "paper.docx", "paper.txt"]
+
+
+@pytest.fixture
+def in_process(monkeypatch):
+    # A single CPU makes create_export_bundle render without a pool
+    monkeypatch.setattr(renderers.os, "cpu_count", lambda: 1)
+
+
+@pytest.fixture
+def temp_root(monkeypatch, tmp_path):
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    return tmp_path
+
+
+def bundle(**kwargs):
+    out = io.BytesIO()
+    renderers.create_export_bundle(PAPER, 10, out, subject="AI", file_stem="paper", **kwargs)
+    out.seek(0)
+    return zipfile.ZipFile(out)
+
+
+def test_archive_names_in_process(in_process):
+    zf = bundle()
+    assert zf.namelist() == NAMES
+    assert zf.read("paper.pdf").startswith(b"%PDF")
+    assert zf.read("paper.txt") == PAPER.encode("utf-8")
+
+
+def test_archive_names_with_process_pool():
+    with renderers.make_export_pool(2) as pool:
+        zf = bundle(executor=pool)
+    assert zf.namelist() == NAMES
+    assert zf.read("paper_preserve.pdf").startswith(b"%PDF")
+    assert zf.read("paper.docx").startswith(b"PK")
+
+
+def test_rendered_formats_are_not_rendered_again(in_process, monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("exam_pdf was rendered again")
+    monkeypatch.setattr(renderers, "create_pdf", fail)
+    zf = bundle(rendered={"exam_pdf": io.BytesIO(b"already rendered")})
+    assert zf.read("paper.pdf") == b"already rendered"
+
+
+def test_plain_text_is_not_sent_to_the_pool():
+    submitted = []
+
+    class RecordingExecutor(ThreadPoolExecutor):
+        def submit(self, fn, fmt, *args):
+            submitted.append(fmt)
+            return super().submit(fn, fmt, *args)
+
+    with RecordingExecutor(max_workers=3) as pool:
+        bundle(executor=pool)
+    assert sorted(submitted) == sorted(renderers.POOLED_EXPORT_FORMATS)
+
+
+def test_unknown_rendered_format_is_rejected(in_process):
+    with pytest.raises(ValueError, match="Unknown export format: html"):
+        bundle(rendered={"html": io.BytesIO(b"")})
+
+
+def test_temp_dir_removed_when_renderer_raises_in_process(in_process, monkeypatch, temp_root):
+    def broken(*args, **kwargs):
+        raise RuntimeError("docx failed")
+    monkeypatch.setattr(renderers, "create_docx_bulk_preserve_format", broken)
+    with pytest.raises(RuntimeError, match="docx failed"):
+        bundle()
+    assert os.listdir(temp_root) == []
+
+
+def test_temp_dir_removed_after_slow_jobs_when_one_raises(monkeypatch, temp_root):
+    create_docx = renderers.create_docx_bulk_preserve_format
+
+    def broken(*args, **kwargs):
+        raise RuntimeError("exam pdf failed")
+
+    def slow_docx(*args, **kwargs):
+        time.sleep(0.3)
+        return create_docx(*args, **kwargs)
+    # exam_pdf is awaited first and fails while docx is still being written
+    monkeypatch.setattr(renderers, "create_pdf", broken)
+    monkeypatch.setattr(renderers, "create_docx_bulk_preserve_format", slow_docx)
+    errors = []
+    render = renderers.render_export_format
+
+    def recording(fmt, *args):
+        try:
+            return render(fmt, *args)
+        except Exception as e:
+            errors.append((fmt, type(e).__name__))
+            raise
+    monkeypatch.setattr(renderers, "render_export_format", recording)
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        with pytest.raises(RuntimeError, match="exam pdf failed"):
+            bundle(executor=pool)
+    # The slow docx job finished writing before its directory was removed
+    assert errors == [("exam_pdf", "RuntimeError")]
+    assert os.listdir(temp_root) == []
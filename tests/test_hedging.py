@@ -0,0 +1,156 @@
+# Checks request hedging against a local stub server with scripted delays.
+# Run from the repository root: python -m pytest tests
+import json
+import math
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pytest
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import app
+
+# path -> list of (delay seconds, status) applied to the 1st, 2nd, ... request on that path
+SCRIPT = {}
+ARRIVALS = {}
+LOCK = threading.Lock()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        path = self.path.split("?")[0]
+        with LOCK:
+            index = ARRIVALS.get(path, 0)
+            ARRIVALS[path] = index + 1
+        steps = SCRIPT.get(path, [])
+        delay, status = steps[index] if index < len(steps) else (0, 200)
+        time.sleep(delay)
+        text = f"{path}#{index}"
+        body = json.dumps({"candidates": [{"content": {"parts": [{"text": text}]}}]}).encode()
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except OSError:
+            pass  # the client dropped a losing attempt
+
+
+@pytest.fixture(scope="module")
+def server():
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{srv.server_port}"
+    srv.shutdown()
+
+
+@pytest.fixture
+def stats():
+    # Plenty of fast samples so the hedge deadline sits at ~50ms
+    stats = app.LatencyStats()
+    for _ in range(200):
+        stats.record_attempt(0.05)
+    return stats
+
+
+def post(url, stats, **kwargs):
+    return app.post_with_hedging(url, {"Content-Type": "application/json"}, {}, stats=stats, **kwargs)
+
+
+def text_of(response):
+    return response.json()["candidates"][0]["content"]["parts"][0]["text"]
+
+
+def test_fast_primary_is_not_hedged(server, stats):
+    SCRIPT["/fast"] = [(0, 200)]
+    response = post(server + "/fast", stats)
+    assert text_of(response) == "/fast#0"
+    assert stats.total_hedges == 0
+    assert ARRIVALS["/fast"] == 1
+
+
+def test_hedge_wins_and_slow_primary_is_discarded(server, stats):
+    SCRIPT["/slow"] = [(1.0, 200), (0, 200)]
+    start = time.perf_counter()
+    response = post(server + "/slow", stats)
+    assert time.perf_counter() - start < 0.5
+    assert text_of(response) == "/slow#1"
+    assert stats.total_hedges == 1
+    # The losing primary still finishes and is recorded, but its answer is dropped
+    time.sleep(1.2)
+    assert ARRIVALS["/slow"] == 2
+    assert len([s for s in stats.attempts if s > 0.9]) == 1
+
+
+def test_failed_hedge_does_not_beat_slow_success(server, stats):
+    SCRIPT["/hedge-500"] = [(0.5, 200), (0, 500)]
+    response = post(server + "/hedge-500", stats)
+    assert response.status_code == 200
+    assert text_of(response) == "/hedge-500#0"
+
+
+def test_error_returned_when_every_attempt_fails(server, stats):
+    SCRIPT["/both-fail"] = [(0.3, 503), (0, 429)]
+    response = post(server + "/both-fail", stats)
+    assert response.status_code == 503
+
+
+def test_budget_caps_hedges(server, stats):
+    budget = 0.1
+    for n in range(20):
+        SCRIPT[f"/budget{n}"] = [(0.3, 200), (0, 200)]
+        post(server + f"/budget{n}", stats, budget=budget)
+    assert 1 <= stats.total_hedges <= math.ceil(budget * stats.total_calls)
+    assert stats.hedge_rate() <= budget
+
+
+def test_budget_caps_hedges_for_concurrent_calls(server, stats):
+    budget = 0.1
+    for n in range(20):
+        # Hedges answer slowly too, so no call finishes before all have started
+        SCRIPT[f"/parallel{n}"] = [(1.0, 200), (0.5, 200)]
+    with ThreadPoolExecutor(max_workers=20) as pool:
+        responses = list(pool.map(lambda n: post(server + f"/parallel{n}", stats, budget=budget), range(20)))
+    assert all(r.status_code == 200 for r in responses)
+    assert stats.total_calls == 20
+    assert 1 <= stats.total_hedges <= math.ceil(budget * stats.total_calls)
+
+
+def test_timeouts_are_recorded(server, stats):
+    SCRIPT["/timeout"] = [(0.5, 200)]
+    before = len(stats.attempts)
+    with pytest.raises(requests.exceptions.Timeout):
+        post(server + "/timeout", stats, budget=0, timeout=0.1)
+    assert len(stats.attempts) == before + 1
+    assert stats.attempts[-1] >= 0.1
+
+
+PARAMS = {"total_marks": 10, "mcq_count": 1, "one_liner_count": 1, "short_count": 1, "long_count": 1}
+
+
+def test_generate_questions_uses_base_url(server):
+    SCRIPT["/gemini"] = [(0, 200)]
+    assert app.generate_questions_gemini("key", "material", PARAMS, base_url=server + "/gemini") == "/gemini#0"
+
+
+def test_generate_questions_hedged(server):
+    SCRIPT["/gemini-hedged"] = [(0, 200)]
+    result = app.generate_questions_gemini("key", "material", PARAMS, hedge=True, base_url=server + "/gemini-hedged")
+    assert result == "/gemini-hedged#0"
+
+
+def test_generate_questions_hedged_reports_request_errors(server):
+    SCRIPT["/gemini-timeout"] = [(0.5, 200)]
+    result = app.generate_questions_gemini("key", "material", PARAMS, hedge=True,
+                                           base_url=server + "/gemini-timeout", timeout=0.1)
+    assert result.startswith("Error: ")